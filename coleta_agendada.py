@@ -0,0 +1,247 @@
+# Executor da coleta sem a interface Streamlit, pensado para cron ou execução contínua.
+#
+# Exemplos:
+#   python coleta_agendada.py                                  # uma coleta com a configuração padrão
+#   python coleta_agendada.py --config coletas.json --resumo resumos.jsonl
+#   python coleta_agendada.py --intervalo 360                  # repete a cada 6 horas
+#
+# O arquivo --config é uma lista JSON de coletas, por exemplo:
+#   [{"nome": "eusebio", "url_base": "https://www.vivareal.com.br/...", "num_paginas": 10}]
+# Os demais campos aceitos são os de ConfiguracaoScraper.
+#
+# As credenciais do Supabase vêm de SUPABASE_URL e SUPABASE_KEY (ambiente ou .env);
+# se alguma faltar, usa .streamlit/secrets.toml, como a interface.
+
+# Bibliotecas utilitárias
+import argparse
+import fcntl
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import fields
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+# Coleta e persistência, compartilhadas com a página Streamlit
+from scraper_vivareal import ConfiguracaoScraper, ProgressoColeta, ScraperVivaReal, SupabaseManager
+
+ARQUIVO_LOCK_PADRAO = "/tmp/coleta_vivareal.lock"
+
+# Códigos de saída
+SAIDA_OK = 0
+SAIDA_FALHA = 1
+SAIDA_EM_ANDAMENTO = 2
+
+logger = logging.getLogger("coleta_agendada")
+
+class ProgressoLog(ProgressoColeta):
+    def __init__(self, nome: str):
+        self.nome = nome
+
+    def atualizar(self, pagina: int, total_paginas: int) -> None:
+        logger.info(f"[{self.nome}] Processando página {pagina}/{total_paginas}")
+
+    def erro(self, mensagem: str) -> None:
+        logger.error(f"[{self.nome}] {mensagem}")
+
+class TravaExecucao:
+    # Trava exclusiva via flock; é liberada pelo sistema mesmo se o processo morrer
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.arquivo = None
+
+    def adquirir(self) -> bool:
+        # Retorna False se outra execução detém a trava; erros de E/S sobem como OSError
+        self.arquivo = open(self.caminho, 'a')
+        try:
+            fcntl.flock(self.arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            self.arquivo.close()
+            self.arquivo = None
+            return False
+        except OSError:
+            self.arquivo.close()
+            self.arquivo = None
+            raise
+
+    def liberar(self) -> None:
+        if self.arquivo:
+            fcntl.flock(self.arquivo, fcntl.LOCK_UN)
+            self.arquivo.close()
+            self.arquivo = None
+
+def validar_num_paginas(valor, origem: str) -> int:
+    if isinstance(valor, bool) or not isinstance(valor, int) or valor < 1:
+        raise ValueError(f"num_paginas inválido em {origem}: {valor!r} (esperado inteiro positivo)")
+    return valor
+
+def carregar_coletas(caminho: Optional[str], num_paginas: int) -> List[Dict]:
+    validar_num_paginas(num_paginas, "--paginas")
+    if not caminho:
+        return [{'nome': 'padrao', 'num_paginas': num_paginas, 'config': ConfiguracaoScraper()}]
+
+    with open(caminho, encoding='utf-8') as arquivo:
+        definicoes = json.load(arquivo)
+
+    if not isinstance(definicoes, list):
+        raise ValueError(f"O arquivo {caminho} deve conter uma lista JSON de coletas")
+
+    campos_config = {campo.name for campo in fields(ConfiguracaoScraper)}
+    coletas = []
+    for indice, definicao in enumerate(definicoes, start=1):
+        if not isinstance(definicao, dict):
+            raise ValueError(f"A coleta {indice} deve ser um objeto JSON")
+        desconhecidos = set(definicao) - campos_config - {'nome', 'num_paginas'}
+        if desconhecidos:
+            raise ValueError(f"Campos desconhecidos na coleta {indice}: {', '.join(sorted(desconhecidos))}")
+        coletas.append({
+            'nome': definicao.get('nome', f"coleta_{indice}"),
+            'num_paginas': validar_num_paginas(definicao.get('num_paginas', num_paginas), f"coleta {indice}"),
+            'config': ConfiguracaoScraper(**{k: v for k, v in definicao.items() if k in campos_config}),
+        })
+    return coletas
+
+def executar_coleta(coleta: Dict, db: Optional[SupabaseManager]) -> Dict:
+    inicio = time.perf_counter()
+    scraper = ScraperVivaReal(coleta['config'])
+    resumo = {
+        'nome': coleta['nome'],
+        'url_base': coleta['config'].url_base,
+        'status': 'ok',
+        'paginas': 0,
+        'imoveis': 0,
+        'salvos': 0,
+        'duracao_s': 0.0,
+        'fases': {},
+        'erro': None,
+    }
+
+    try:
+        df = scraper.coletar_dados(coleta['num_paginas'], progresso=ProgressoLog(coleta['nome']))
+        resumo['paginas'] = scraper.paginas_coletadas
+        resumo['fases'] = dict(scraper.tempos_fases)
+
+        if scraper.ultimo_erro:
+            # Falha fatal (navegador, localização ou erro crítico), não ausência de anúncios
+            resumo['status'] = 'erro'
+            resumo['erro'] = scraper.ultimo_erro
+        elif df is None or df.empty:
+            resumo['status'] = 'sem_dados'
+        else:
+            resumo['imoveis'] = len(df)
+            if db is not None:
+                inicio_fase = time.perf_counter()
+                db.inserir_dados(df)
+                resumo['fases']['persistencia'] = round(time.perf_counter() - inicio_fase, 3)
+                resumo['salvos'] = len(df)
+    except Exception as e:
+        logger.error(f"[{coleta['nome']}] Erro na coleta: {str(e)}")
+        resumo['status'] = 'erro'
+        resumo['erro'] = str(e)
+
+    resumo['duracao_s'] = round(time.perf_counter() - inicio, 3)
+    return resumo
+
+def criar_supabase() -> SupabaseManager:
+    return SupabaseManager(os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_KEY"))
+
+def executar_rodada(coletas: List[Dict], salvar: bool, caminho_lock: str) -> Dict:
+    inicio = time.perf_counter()
+    resumo = {
+        'inicio': datetime.now().isoformat(timespec='seconds'),
+        'fim': None,
+        'status': 'ok',
+        'duracao_s': 0.0,
+        'paginas': 0,
+        'imoveis': 0,
+        'coletas': [],
+        'erro': None,
+    }
+
+    trava = TravaExecucao(caminho_lock)
+    try:
+        adquirida = trava.adquirir()
+    except OSError as e:
+        # Caminho inexistente ou sem permissão: a rodada falha, mas o resumo é publicado
+        logger.error(f"Não foi possível abrir o arquivo de trava {caminho_lock}: {str(e)}")
+        resumo['status'] = 'falha'
+        resumo['erro'] = f"Erro no arquivo de trava: {str(e)}"
+    else:
+        if not adquirida:
+            logger.warning(f"Outra coleta já está em andamento ({caminho_lock}); execução ignorada")
+            resumo['status'] = 'em_andamento'
+
+    if resumo['status'] == 'ok':
+        try:
+            db = criar_supabase() if salvar else None
+            for coleta in coletas:
+                resumo['coletas'].append(executar_coleta(coleta, db))
+        except Exception as e:
+            logger.error(f"Erro ao preparar a coleta: {str(e)}")
+            resumo['erro'] = str(e)
+        finally:
+            trava.liberar()
+
+        resumo['paginas'] = sum(c['paginas'] for c in resumo['coletas'])
+        resumo['imoveis'] = sum(c['imoveis'] for c in resumo['coletas'])
+        if resumo['erro'] or any(c['status'] != 'ok' for c in resumo['coletas']):
+            resumo['status'] = 'falha'
+
+    resumo['fim'] = datetime.now().isoformat(timespec='seconds')
+    resumo['duracao_s'] = round(time.perf_counter() - inicio, 3)
+    return resumo
+
+def publicar_resumo(resumo: Dict, caminho: Optional[str]) -> None:
+    linha = json.dumps(resumo, ensure_ascii=False)
+    print(linha, flush=True)
+    if caminho:
+        with open(caminho, 'a', encoding='utf-8') as arquivo:
+            arquivo.write(linha + '\n')
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Coleta agendada de terrenos no VivaReal, sem interface Streamlit.")
+    parser.add_argument('--config', help="Arquivo JSON com a lista de coletas (padrão: ConfiguracaoScraper)")
+    parser.add_argument('--paginas', type=int, default=10, help="Páginas por coleta quando não definido no --config")
+    parser.add_argument('--intervalo', type=float, default=0,
+                        help="Minutos entre rodadas; 0 executa uma única vez (uso com cron)")
+    parser.add_argument('--lock', default=ARQUIVO_LOCK_PADRAO, help="Arquivo de trava contra execuções simultâneas")
+    parser.add_argument('--resumo', help="Arquivo JSON Lines onde cada rodada acrescenta seu resumo")
+    parser.add_argument('--sem-salvar', action='store_true', help="Coleta sem gravar no Supabase")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = criar_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    load_dotenv()
+
+    try:
+        coletas = carregar_coletas(args.config, args.paginas)
+    except (OSError, ValueError) as e:
+        logger.error(f"Configuração de coletas inválida: {str(e)}")
+        return SAIDA_FALHA
+
+    while True:
+        inicio_rodada = time.monotonic()
+        resumo = executar_rodada(coletas, not args.sem_salvar, args.lock)
+        publicar_resumo(resumo, args.resumo)
+
+        if args.intervalo <= 0:
+            if resumo['status'] == 'em_andamento':
+                return SAIDA_EM_ANDAMENTO
+            return SAIDA_OK if resumo['status'] == 'ok' else SAIDA_FALHA
+
+        espera = args.intervalo * 60 - (time.monotonic() - inicio_rodada)
+        if espera > 0:
+            logger.info(f"Próxima rodada em {espera / 60:.1f} minutos")
+            time.sleep(espera)
+
+if __name__ == "__main__":
+    sys.exit(main())
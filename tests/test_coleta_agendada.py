@@ -0,0 +1,138 @@
+import json
+
+import pandas as pd
+import pytest
+
+import coleta_agendada
+from coleta_agendada import TravaExecucao, carregar_coletas, executar_rodada
+from scraper_vivareal import ConfiguracaoScraper
+
+class ScraperFalso:
+    # Substitui ScraperVivaReal: devolve um anúncio por página, sem navegador
+    falha = None
+
+    def __init__(self, config):
+        self.config = config
+        self.paginas_coletadas = 0
+        self.tempos_fases = {}
+        self.ultimo_erro = None
+
+    def coletar_dados(self, num_paginas=10, progresso=None):
+        if self.falha:
+            self.ultimo_erro = self.falha
+            return None
+        self.paginas_coletadas = num_paginas
+        self.tempos_fases = {'navegador': 0.1, 'paginas': 0.2}
+        return pd.DataFrame({'id': range(1, num_paginas + 1)})
+
+class SupabaseFalso:
+    def __init__(self):
+        self.inseridos = []
+
+    def inserir_dados(self, df):
+        self.inseridos.append(len(df))
+
+@pytest.fixture
+def scraper_falso(monkeypatch):
+    ScraperFalso.falha = None
+    monkeypatch.setattr(coleta_agendada, 'ScraperVivaReal', ScraperFalso)
+    return ScraperFalso
+
+@pytest.fixture
+def supabase_falso(monkeypatch):
+    db = SupabaseFalso()
+    monkeypatch.setattr(coleta_agendada, 'criar_supabase', lambda: db)
+    return db
+
+@pytest.fixture
+def lock(tmp_path):
+    return str(tmp_path / 'coleta.lock')
+
+def coleta(nome, num_paginas):
+    return {'nome': nome, 'num_paginas': num_paginas, 'config': ConfiguracaoScraper()}
+
+def test_trava_recusa_segunda_execucao(lock):
+    primeira = TravaExecucao(lock)
+    segunda = TravaExecucao(lock)
+    assert primeira.adquirir()
+    try:
+        assert not segunda.adquirir()
+    finally:
+        primeira.liberar()
+    assert segunda.adquirir()
+    segunda.liberar()
+
+def test_rodada_ignorada_com_trava_ocupada(scraper_falso, lock, capsys):
+    trava = TravaExecucao(lock)
+    assert trava.adquirir()
+    try:
+        resumo = executar_rodada([coleta('a', 1)], False, lock)
+        assert resumo['status'] == 'em_andamento'
+        assert resumo['coletas'] == []
+
+        codigo = coleta_agendada.main(['--sem-salvar', '--lock', lock])
+    finally:
+        trava.liberar()
+    assert codigo == coleta_agendada.SAIDA_EM_ANDAMENTO
+    assert json.loads(capsys.readouterr().out)['status'] == 'em_andamento'
+
+def test_trava_em_caminho_invalido_gera_falha(scraper_falso, tmp_path, capsys):
+    lock = str(tmp_path / 'inexistente' / 'coleta.lock')
+    codigo = coleta_agendada.main(['--sem-salvar', '--lock', lock])
+    resumo = json.loads(capsys.readouterr().out)
+    assert codigo == coleta_agendada.SAIDA_FALHA
+    assert resumo['status'] == 'falha'
+    assert 'trava' in resumo['erro']
+
+def test_resumo_soma_paginas_e_imoveis(scraper_falso, lock, capsys):
+    resumo = executar_rodada([coleta('a', 2), coleta('b', 3)], False, lock)
+    assert resumo['status'] == 'ok'
+    assert resumo['paginas'] == 5
+    assert resumo['imoveis'] == 5
+    assert [c['nome'] for c in resumo['coletas']] == ['a', 'b']
+    assert coleta_agendada.main(['--sem-salvar', '--paginas', '1', '--lock', lock]) == coleta_agendada.SAIDA_OK
+
+def test_fase_persistencia_apenas_ao_salvar(scraper_falso, supabase_falso, lock):
+    sem_salvar = executar_rodada([coleta('a', 2)], False, lock)['coletas'][0]
+    assert 'persistencia' not in sem_salvar['fases']
+    assert sem_salvar['salvos'] == 0
+    assert supabase_falso.inseridos == []
+
+    salvando = executar_rodada([coleta('a', 2)], True, lock)['coletas'][0]
+    assert 'persistencia' in salvando['fases']
+    assert salvando['salvos'] == 2
+    assert supabase_falso.inseridos == [2]
+
+def test_falha_do_scraper_aparece_no_resumo(scraper_falso, lock, capsys):
+    scraper_falso.falha = "Não foi possível inicializar o navegador"
+    resumo = executar_rodada([coleta('a', 2)], False, lock)
+    assert resumo['status'] == 'falha'
+    assert resumo['coletas'][0]['status'] == 'erro'
+    assert resumo['coletas'][0]['erro'] == scraper_falso.falha
+    assert coleta_agendada.main(['--sem-salvar', '--lock', lock]) == coleta_agendada.SAIDA_FALHA
+
+def test_carregar_coletas_valida(tmp_path):
+    caminho = tmp_path / 'coletas.json'
+    caminho.write_text(json.dumps([{'nome': 'a', 'num_paginas': 2}, {'url_base': 'https://exemplo'}]))
+    coletas = carregar_coletas(str(caminho), 5)
+    assert [c['nome'] for c in coletas] == ['a', 'coleta_2']
+    assert [c['num_paginas'] for c in coletas] == [2, 5]
+    assert coletas[1]['config'].url_base == 'https://exemplo'
+
+@pytest.mark.parametrize('conteudo, mensagem', [
+    ({'nome': 'a'}, 'lista JSON'),
+    (['a'], 'objeto JSON'),
+    ([{'num_paginas': '3'}], 'num_paginas'),
+    ([{'num_paginas': 0}], 'num_paginas'),
+    ([{'num_paginas': True}], 'num_paginas'),
+    ([{'paginas': 3}], 'Campos desconhecidos'),
+])
+def test_carregar_coletas_rejeita_entrada_invalida(tmp_path, conteudo, mensagem):
+    caminho = tmp_path / 'coletas.json'
+    caminho.write_text(json.dumps(conteudo))
+    with pytest.raises(ValueError, match=mensagem):
+        carregar_coletas(str(caminho), 10)
+
+def test_paginas_padrao_invalido():
+    with pytest.raises(ValueError, match='--paginas'):
+        carregar_coletas(None, 0)